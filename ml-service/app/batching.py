@@ -0,0 +1,70 @@
+"""Request coalescing for model inference"""
+import asyncio
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, List, Tuple
+from app.config import PREDICT_BATCH_WAIT_MS, PREDICT_BATCH_MAX_SIZE
+from app.uc_registry import UCRegistry, registry
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-row predictions into one batch per UC
+    
+    The first request for a UC opens a batch; everything that arrives within
+    the wait window (or until the batch is full) is scored by a single
+    registry.predict_batch call in the threadpool.
+    """
+    
+    def __init__(self, registry: UCRegistry,
+                 max_wait_ms: float = PREDICT_BATCH_WAIT_MS,
+                 max_batch_size: int = PREDICT_BATCH_MAX_SIZE):
+        self.registry = registry
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[str, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+        self._tasks = set()
+    
+    async def predict(self, uc_id: str, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score one feature vector; returns (probs [1, 2], shap_values [1, n_features])"""
+        loop = asyncio.get_running_loop()
+        
+        batch = self._pending.get(uc_id)
+        if batch is None:
+            batch = self._pending[uc_id] = []
+            loop.call_later(self.max_wait, self._flush, uc_id, batch)
+        
+        future = loop.create_future()
+        batch.append((features, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(uc_id, batch)
+        
+        return await future
+    
+    def _flush(self, uc_id: str, batch: list):
+        """Hand a batch to the threadpool (no-op if it was already flushed)"""
+        if self._pending.get(uc_id) is not batch:
+            return
+        del self._pending[uc_id]
+        
+        task = asyncio.ensure_future(self._run(uc_id, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, uc_id: str, batch: list):
+        """Score a batch and resolve each request's future with its row"""
+        try:
+            X = np.stack([features for features, _ in batch])
+            probs, shap_values = await run_in_threadpool(self.registry.predict_batch, uc_id, X)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result((probs[i:i + 1], shap_values[i:i + 1]))
+
+
+# Global batcher instance
+batcher = PredictionBatcher(registry)
@@ -0,0 +1,31 @@
+"""Probability calibration shared by training and inference"""
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+
+
+def fit_platt_calibrator(p, y) -> LogisticRegression:
+    """Platt scaling with prior-smoothed targets (as in CalibratedClassifierCV)
+    
+    The soft targets are fitted as a weighted logistic regression over each
+    sample duplicated once per class.
+    """
+    y = np.asarray(y)
+    n_pos = np.count_nonzero(y == 1)
+    n_neg = len(y) - n_pos
+    targets = np.where(y == 1, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+    
+    X = np.concatenate([p, p]).reshape(-1, 1)
+    labels = np.repeat([1, 0], len(p))
+    weights = np.concatenate([targets, 1 - targets])
+    
+    return LogisticRegression(penalty=None).fit(X, labels, sample_weight=weights)
+
+
+def apply_calibration(calibrator, p: np.ndarray) -> np.ndarray:
+    """Map raw positive-class probabilities to calibrated [negative, positive]"""
+    if isinstance(calibrator, IsotonicRegression):
+        p_cal = calibrator.predict(p)
+    else:
+        p_cal = calibrator.predict_proba(p.reshape(-1, 1))[:, 1]
+    return np.column_stack([1 - p_cal, p_cal])
@@ -74,3 +74,7 @@ XGB_PARAMS = {
     "min_child_weight": 1,
     "random_state": 42
 }
+
+# Inference request coalescing (concurrent single-row calls share one batch)
+PREDICT_BATCH_WAIT_MS = 2
+PREDICT_BATCH_MAX_SIZE = 64
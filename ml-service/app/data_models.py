@@ -1,5 +1,5 @@
 """Pydantic models for request/response schemas"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 
 
@@ -14,8 +14,13 @@ class MLResponse(BaseModel):
     shap_top: List[Dict[str, Any]]
 
 
+# Base request model; requests are read-only once validated
+class MLRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+
 # UC-1: Case Priority
-class CasePriorityRequest(BaseModel):
+class CasePriorityRequest(MLRequest):
     case_id: str
     latest_message_id: Optional[str] = None
     days_open: int = 0
@@ -30,7 +35,7 @@ class CasePriorityResponse(MLResponse):
 
 
 # UC-2: Check-in Escalation
-class CheckinEscalationRequest(BaseModel):
+class CheckinEscalationRequest(MLRequest):
     case_id: str
     checkin_id: str
     pain_delta: float = 0.0
@@ -45,7 +50,7 @@ class CheckinEscalationResponse(MLResponse):
 
 
 # UC-3: Incident Routing
-class IncidentRoutingRequest(BaseModel):
+class IncidentRoutingRequest(MLRequest):
     case_id: str
     text: Optional[str] = None
     incident_logged: bool = False
@@ -59,7 +64,7 @@ class IncidentRoutingResponse(MLResponse):
 
 
 # UC-4: Document Completeness
-class DocCompletenessRequest(BaseModel):
+class DocCompletenessRequest(MLRequest):
     case_id: str
     has_medical_cert: bool = False
     has_incident_report: bool = False
@@ -72,7 +77,7 @@ class DocCompletenessResponse(MLResponse):
 
 
 # UC-5: Email Auto-Send Strategy
-class EmailStrategyRequest(BaseModel):
+class EmailStrategyRequest(MLRequest):
     thread_id: str
     draft_type: str
     text: str
@@ -88,7 +93,7 @@ class EmailStrategyResponse(MLResponse):
 
 
 # UC-6: Complaint Risk
-class ComplaintRiskRequest(BaseModel):
+class ComplaintRiskRequest(MLRequest):
     thread_id: str
     subject: str
     body: str
@@ -103,7 +108,7 @@ class ComplaintRiskResponse(MLResponse):
 
 
 # UC-7: Fraud Detection
-class FraudDocRequest(BaseModel):
+class FraudDocRequest(MLRequest):
     case_id: str
     doc_id: str
     ocr_text: str
@@ -119,7 +124,7 @@ class FraudDocResponse(MLResponse):
 
 
 # UC-8: Phishing Detection
-class PhishingRequest(BaseModel):
+class PhishingRequest(MLRequest):
     thread_id: str
     subject: str
     body: str
@@ -136,7 +141,7 @@ class PhishingResponse(MLResponse):
 
 
 # UC-9: Recovery Timeline
-class RecoveryTimelineRequest(BaseModel):
+class RecoveryTimelineRequest(MLRequest):
     case_id: str
     injury_type_back: bool = False
     injury_type_shoulder: bool = False
@@ -158,7 +163,7 @@ class RecoveryTimelineResponse(MLResponse):
 
 
 # UC-10: Inherent Requirements Non-Fit
-class IRNFRequest(BaseModel):
+class IRNFRequest(MLRequest):
     case_id: str
     restrictions_lift_kg: int = 0
     restrictions_stand_hours: float = 0.0
@@ -175,7 +180,7 @@ class IRNFResponse(MLResponse):
 
 
 # UC-11: Work-Relatedness
-class WorkRelatedRequest(BaseModel):
+class WorkRelatedRequest(MLRequest):
     case_id: str
     incident_logged: bool = False
     injury_register_logged: bool = False
@@ -192,7 +197,7 @@ class WorkRelatedResponse(MLResponse):
 
 
 # UC-12: Obligation Compliance
-class ObligationComplianceRequest(BaseModel):
+class ObligationComplianceRequest(MLRequest):
     case_id: str
     missed_appts_7d: int = 0
     missed_appts_30d: int = 0
@@ -201,6 +206,11 @@ class ObligationComplianceRequest(BaseModel):
     avg_response_latency_mins: float = 0.0
     checkin_completion_rate: float = 1.0
     communication_breakdown_flag: bool = False
+    
+    @property
+    def is_workcover(self) -> bool:
+        """WorkCover case heuristic: WC-prefixed case ID or >2 missed appointments (7d)"""
+        return self.case_id.startswith("WC") or self.missed_appts_7d > 2
 
 
 class ObligationComplianceResponse(MLResponse):
@@ -209,7 +219,7 @@ class ObligationComplianceResponse(MLResponse):
 
 
 # UC-13: Claim Escalation
-class ClaimEscalationRequest(BaseModel):
+class ClaimEscalationRequest(MLRequest):
     case_id: str
     keyword_lawyer: int = 0
     keyword_claim: int = 0
@@ -225,3 +235,21 @@ class ClaimEscalationRequest(BaseModel):
 
 class ClaimEscalationResponse(MLResponse):
     pass
+
+
+# Request model for each use case, used to resolve per-UC feature fields
+UC_REQUEST_MODELS = {
+    "uc_1": CasePriorityRequest,
+    "uc_2": CheckinEscalationRequest,
+    "uc_3": IncidentRoutingRequest,
+    "uc_4": DocCompletenessRequest,
+    "uc_5": EmailStrategyRequest,
+    "uc_6": ComplaintRiskRequest,
+    "uc_7": FraudDocRequest,
+    "uc_8": PhishingRequest,
+    "uc_9": RecoveryTimelineRequest,
+    "uc_10": IRNFRequest,
+    "uc_11": WorkRelatedRequest,
+    "uc_12": ObligationComplianceRequest,
+    "uc_13": ClaimEscalationRequest,
+}
@@ -3,7 +3,86 @@ import json
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+from weakref import WeakKeyDictionary
+from app.data_models import UC_REQUEST_MODELS
+
+
+# Human-readable feature labels (constant; exposed read-only)
+_FEATURE_LABELS = {
+    "days_open": "Days case open",
+    "sla_breaches": "SLA breaches",
+    "sentiment_compound": "Overall sentiment",
+    "anger_score": "Anger level",
+    "fear_score": "Fear level",
+    "text_length": "Message length",
+    "keyword_doctor": "Doctor mentions",
+    "keyword_claim": "Claim mentions",
+    "keyword_lawyer": "Lawyer mentions",
+    "injury_terms_count": "Injury terms",
+    "prior_escalations": "Prior escalations",
+    "checkin_completion_rate": "Check-in completion",
+    "missed_appts_7d": "Missed appointments (7d)",
+    "missed_appts_30d": "Missed appointments (30d)",
+    "refused_duties_flag": "Refused suitable duties",
+    "cert_late_days": "Certificate delay (days)",
+    "incident_logged": "Incident logged",
+    "witness_present": "Witness present",
+    "report_delay_days": "Report delay (days)",
+    "injury_severity_scale": "Injury severity",
+    "comorbidities_count": "Comorbidities",
+    "treatment_sessions_total": "Treatment sessions",
+    "imaging_delay_days": "Imaging delay (days)",
+    "doctor_changes_count": "Doctor changes",
+    "ocr_text_mismatch_rate": "OCR mismatch rate",
+    "doc_hash_repeat": "Duplicate document",
+    "font_anomaly_flag": "Font anomaly",
+    "provider_abn_match": "Provider ABN match",
+    "sender_domain_reputation": "Sender reputation",
+    "url_count": "URL count",
+    "url_reputation_min": "URL reputation",
+    "preexisting_same_bodypart": "Prior same injury",
+    "gradual_onset_flag": "Gradual onset",
+    "neg_sentiment_trend_7d": "Negative trend (7d)",
+    "diagnostic_delay_flag": "Diagnostic delay",
+    "pain_delta": "Pain change",
+    "fatigue_delta": "Fatigue change",
+    "sleep_decline_flag": "Sleep declining",
+    "has_medical_cert": "Medical certificate",
+    "has_incident_report": "Incident report",
+    "has_imaging_referral": "Imaging referral",
+    "complaint_keywords_count": "Complaint keywords",
+    "prior_human_overrides": "Prior overrides",
+    "thread_depth": "Email thread depth",
+    "accusatory_phrase_count": "Accusatory phrases",
+    "worker_age": "Worker age",
+    "psychosocial_flags_count": "Psychosocial flags",
+    "rtw_attempts_count": "RTW attempts",
+    "progress_weeks": "Recovery weeks",
+    "restrictions_lift_kg": "Lifting restriction",
+    "restrictions_stand_hours": "Standing restriction",
+    "cognitive_restrict_flag": "Cognitive restriction",
+    "role_lift_req_kg": "Role lifting requirement",
+    "role_stand_req_hours": "Role standing requirement",
+    "role_cognitive_load": "Role cognitive load",
+    "cctv_available": "CCTV available",
+    "cert_wording_nonoccupational": "Non-occupational wording",
+    "communication_breakdown_flag": "Communication breakdown",
+    "injury_type_back": "Back injury",
+    "injury_type_shoulder": "Shoulder injury",
+    "injury_type_knee": "Knee injury",
+    "injury_type_psychological": "Psychological injury",
+    "caps_ratio": "Uppercase ratio",
+    "question_density": "Question density",
+    "consecutive_missed_appts": "Consecutive missed",
+    "avg_response_latency_mins": "Response latency",
+    "injury_register_logged": "Injury register",
+    "channel_email": "Email channel",
+    "channel_whatsapp": "WhatsApp channel",
+    "channel_web": "Web channel"
+}
+FEATURE_LABELS = MappingProxyType(_FEATURE_LABELS)
 
 
 class FeatureExtractor:
@@ -13,108 +92,108 @@ class FeatureExtractor:
             schema = json.load(f)
         self.features = [f["name"] for f in schema["features"]]
         self.feature_types = {f["name"]: f["type"] for f in schema["features"]}
+        
+        # Schema defaults are all zero (bool False -> 0.0), so one zeroed
+        # template plus a name -> position index is enough to build a vector
+        self._default_vec = np.zeros(len(self.features), dtype=np.float64)
+        self._name_to_idx = {name: i for i, name in enumerate(self.features)}
+        
+        # Request model class -> [(field_name, feature_index), ...]
+        self._model_field_idx = WeakKeyDictionary()
+        
+        # The schema fields each UC's request model can actually supply
+        self._uc_field_sets: Dict[str, List[Tuple[str, int]]] = {
+            uc: self._model_fields(model_cls)
+            for uc, model_cls in UC_REQUEST_MODELS.items()
+        }
+    
+    def _model_fields(self, model_cls: Any) -> List[Tuple[str, int]]:
+        """Resolve a request model's schema fields to feature positions"""
+        field_idx = self._model_field_idx.get(model_cls)
+        if field_idx is None:
+            field_idx = [
+                (name, self._name_to_idx[name])
+                for name in model_cls.model_fields
+                if name in self._name_to_idx
+            ]
+            self._model_field_idx[model_cls] = field_idx
+        return field_idx
     
     def extract(self, request_data: Dict[str, Any], uc: str) -> np.ndarray:
-        """Extract features from request data for a specific use case"""
-        feature_dict = {}
+        """Extract features from request data for a specific use case
+        
+        For a UC with a registered request model, only that model's fields
+        are read; other keys in request_data are ignored (left at their
+        defaults) even if they name schema features. Unknown UCs fill every
+        schema feature present in request_data.
+        """
+        field_set = self._uc_field_sets.get(uc)
+        if field_set is not None:
+            # Only the UC's own fields can be non-default
+            feature_array = self._default_vec.copy()
+            for name, idx in field_set:
+                value = request_data.get(name)
+                if value is not None:
+                    feature_array[idx] = float(value) if isinstance(value, bool) else value
+            return feature_array
         
-        # Initialize all features with defaults
-        for feat in self.features:
-            if self.feature_types[feat] == "bool":
-                feature_dict[feat] = False
-            elif self.feature_types[feat] in ["int", "float"]:
-                feature_dict[feat] = 0
-            else:
-                feature_dict[feat] = 0
+        feature_array = self._default_vec.copy()
         
-        # Update with provided values
+        # Fill in provided values, ignoring keys outside the schema
         for key, value in request_data.items():
-            if key in feature_dict:
-                feature_dict[key] = value
+            idx = self._name_to_idx.get(key)
+            if idx is not None:
+                feature_array[idx] = float(value) if isinstance(value, bool) else value
         
-        # Convert to ordered array
-        feature_array = np.array([feature_dict[f] for f in self.features], dtype=float)
         return feature_array
     
+    def extract_from_model(self, obj: Any, uc: str) -> np.ndarray:
+        """Extract features straight from a request model's attributes
+        
+        Avoids model_dump() by reading only the fields that map onto the
+        schema; the field -> index mapping is resolved once per model class.
+        """
+        field_idx = self._model_fields(type(obj))
+        
+        feature_array = self._default_vec.copy()
+        for name, idx in field_idx:
+            feature_array[idx] = getattr(obj, name)
+        
+        return feature_array
+    
+    def extract_batch(self, records: List[Dict[str, Any]], uc: str) -> np.ndarray:
+        """Extract an (N, n_features) matrix for a batch of request dicts
+        
+        Provided values are collected as (row, col, value) triples and
+        scattered into the tiled default vector in a single numpy assignment.
+        As in extract(), a registered UC only reads its request model's fields.
+        """
+        field_set = self._uc_field_sets.get(uc)
+        if field_set is None:
+            field_set = list(self._name_to_idx.items())
+        
+        feature_matrix = np.tile(self._default_vec, (len(records), 1))
+        
+        rows, cols, vals = [], [], []
+        for row, request_data in enumerate(records):
+            for name, idx in field_set:
+                value = request_data.get(name)
+                if value is not None:
+                    rows.append(row)
+                    cols.append(idx)
+                    vals.append(float(value))
+        
+        if rows:
+            feature_matrix[rows, cols] = vals
+        return feature_matrix
+    
     def get_feature_order(self) -> List[str]:
         """Get the ordered list of feature names"""
         return self.features
     
-    def get_feature_labels(self) -> Dict[str, str]:
+    def get_feature_labels(self) -> Mapping[str, str]:
         """Get human-readable labels for features"""
-        labels = {
-            "days_open": "Days case open",
-            "sla_breaches": "SLA breaches",
-            "sentiment_compound": "Overall sentiment",
-            "anger_score": "Anger level",
-            "fear_score": "Fear level",
-            "text_length": "Message length",
-            "keyword_doctor": "Doctor mentions",
-            "keyword_claim": "Claim mentions",
-            "keyword_lawyer": "Lawyer mentions",
-            "injury_terms_count": "Injury terms",
-            "prior_escalations": "Prior escalations",
-            "checkin_completion_rate": "Check-in completion",
-            "missed_appts_7d": "Missed appointments (7d)",
-            "missed_appts_30d": "Missed appointments (30d)",
-            "refused_duties_flag": "Refused suitable duties",
-            "cert_late_days": "Certificate delay (days)",
-            "incident_logged": "Incident logged",
-            "witness_present": "Witness present",
-            "report_delay_days": "Report delay (days)",
-            "injury_severity_scale": "Injury severity",
-            "comorbidities_count": "Comorbidities",
-            "treatment_sessions_total": "Treatment sessions",
-            "imaging_delay_days": "Imaging delay (days)",
-            "doctor_changes_count": "Doctor changes",
-            "ocr_text_mismatch_rate": "OCR mismatch rate",
-            "doc_hash_repeat": "Duplicate document",
-            "font_anomaly_flag": "Font anomaly",
-            "provider_abn_match": "Provider ABN match",
-            "sender_domain_reputation": "Sender reputation",
-            "url_count": "URL count",
-            "url_reputation_min": "URL reputation",
-            "preexisting_same_bodypart": "Prior same injury",
-            "gradual_onset_flag": "Gradual onset",
-            "neg_sentiment_trend_7d": "Negative trend (7d)",
-            "diagnostic_delay_flag": "Diagnostic delay",
-            "pain_delta": "Pain change",
-            "fatigue_delta": "Fatigue change",
-            "sleep_decline_flag": "Sleep declining",
-            "has_medical_cert": "Medical certificate",
-            "has_incident_report": "Incident report",
-            "has_imaging_referral": "Imaging referral",
-            "complaint_keywords_count": "Complaint keywords",
-            "prior_human_overrides": "Prior overrides",
-            "thread_depth": "Email thread depth",
-            "accusatory_phrase_count": "Accusatory phrases",
-            "worker_age": "Worker age",
-            "psychosocial_flags_count": "Psychosocial flags",
-            "rtw_attempts_count": "RTW attempts",
-            "progress_weeks": "Recovery weeks",
-            "restrictions_lift_kg": "Lifting restriction",
-            "restrictions_stand_hours": "Standing restriction",
-            "cognitive_restrict_flag": "Cognitive restriction",
-            "role_lift_req_kg": "Role lifting requirement",
-            "role_stand_req_hours": "Role standing requirement",
-            "role_cognitive_load": "Role cognitive load",
-            "cctv_available": "CCTV available",
-            "cert_wording_nonoccupational": "Non-occupational wording",
-            "communication_breakdown_flag": "Communication breakdown",
-            "injury_type_back": "Back injury",
-            "injury_type_shoulder": "Shoulder injury",
-            "injury_type_knee": "Knee injury",
-            "injury_type_psychological": "Psychological injury",
-            "caps_ratio": "Uppercase ratio",
-            "question_density": "Question density",
-            "consecutive_missed_appts": "Consecutive missed",
-            "avg_response_latency_mins": "Response latency",
-            "injury_register_logged": "Injury register",
-            "channel_email": "Email channel",
-            "channel_whatsapp": "WhatsApp channel",
-            "channel_web": "Web channel"
-        }
-        return labels
+        return FEATURE_LABELS
 
 
 # Global instance
@@ -1,9 +1,16 @@
 """FastAPI ML Service for GPNet Case Management"""
-from fastapi import FastAPI, HTTPException
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Type, TypeVar
 from app.uc_registry import registry
+from app.batching import batcher
 from app.features import feature_extractor
 from app.policy import uc1_policy, uc7_policy, uc12_policy, uc13_policy
 from app.data_models import (
@@ -14,10 +21,20 @@ from app.data_models import (
 )
 from app.config import MODEL_VERSION
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up the models at startup so the first request skips cold paths"""
+    await run_in_threadpool(registry.eager_load_all)
+    yield
+
+
 app = FastAPI(
     title="GPNet ML Service",
     description="XGBoost-based ML predictions for case management",
-    version=MODEL_VERSION
+    version=MODEL_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -29,6 +46,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+RequestModel = TypeVar("RequestModel", bound=BaseModel)
+
+
+def json_body(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for handlers that parse the raw body themselves"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model_cls.model_json_schema()}}
+        }
+    }
+
+
+def _body_validation_error(e: ValidationError) -> RequestValidationError:
+    """Re-raise a pydantic ValidationError with FastAPI's body locations"""
+    return RequestValidationError([
+        {**error, "loc": ("body", *error["loc"])}
+        for error in e.errors(include_url=False)
+    ])
+
+
+def _validate_body_like_fastapi(body: bytes, model_cls: Type[RequestModel]) -> RequestModel:
+    """FastAPI's own body handling: json.loads, then dict validation
+    
+    Used when the whole body is rejected (bad JSON, empty or non-object), since
+    pydantic-core reports those differently (json_invalid / model_type) from
+    the 422s FastAPI returns.
+    """
+    try:
+        data = json.loads(body) if body else None
+    except json.JSONDecodeError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", e.pos),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": e.msg}
+        }], body=e.doc)
+    
+    if data is None:
+        raise RequestValidationError([{
+            "type": "missing",
+            "loc": ("body",),
+            "msg": "Field required",
+            "input": None
+        }])
+    
+    try:
+        return model_cls.model_validate(data, from_attributes=True)
+    except ValidationError as e:
+        raise _body_validation_error(e)
+
+
+async def parse_body(http_request: Request, model_cls: Type[RequestModel]) -> RequestModel:
+    """Validate the raw JSON body in one pass with pydantic-core's parser
+    
+    Skips FastAPI's json.loads + dict validation round-trip while keeping
+    its 422 error format; errors about the body as a whole (bad JSON, empty
+    or non-object body) fall back to FastAPI's path so they match exactly.
+    """
+    body = await http_request.body()
+    try:
+        # The model's compiled core validator, without the model_validate_json /
+        # TypeAdapter wrappers (both only add dispatch on top of it)
+        return model_cls.__pydantic_validator__.validate_json(body)
+    except ValidationError as e:
+        if any(not error["loc"] for error in e.errors(include_url=False)):
+            return _validate_body_like_fastapi(body, model_cls)
+        raise _body_validation_error(e)
+
 
 @app.get("/health")
 async def health_check():
@@ -40,31 +127,33 @@ async def health_check():
     }
 
 
-@app.post("/ml/score/case-priority", response_model=CasePriorityResponse)
-async def score_case_priority(request: CasePriorityRequest):
+@app.post(
+    "/ml/score/case-priority",
+    response_model=CasePriorityResponse,
+    openapi_extra=json_body(CasePriorityRequest)
+)
+async def score_case_priority(http_request: Request):
     """UC-1: Case Priority Scoring
     
     Returns priority band (red/yellow/green), score, and recommendation
     """
+    request = await parse_body(http_request, CasePriorityRequest)
+    
     try:
         # Extract features
-        request_dict = request.model_dump()
-        features = feature_extractor.extract(request_dict, "uc_1")
+        features = feature_extractor.extract_from_model(request, "uc_1")
         
-        # Get prediction and SHAP values
-        probs, shap_values = registry.predict("uc_1", features)
+        # Get prediction and SHAP values (batched with concurrent requests, off the event loop)
+        probs, shap_values = await batcher.predict("uc_1", features)
         
         # Handle multiclass probabilities
         # UC-1 binary model: high=1, medium/low=0
-        # Map back to 3 classes for policy
-        prob_high = float(probs[0, 1])
-        prob_medium = float(probs[0, 0]) * 0.6  # Split low probability
-        prob_low = float(probs[0, 0]) * 0.4
-        
+        # Map back to 3 classes for policy (split low probability)
+        prob_rest, prob_high = probs[0].tolist()
         probs_dict = {
             "high": prob_high,
-            "medium": prob_medium,
-            "low": prob_low
+            "medium": prob_rest * 0.6,
+            "low": prob_rest * 0.4
         }
         
         # Apply policy
@@ -73,7 +162,7 @@ async def score_case_priority(request: CasePriorityRequest):
         # Get top SHAP features
         shap_top = registry.get_top_shap_features("uc_1", shap_values, features, top_k=5)
         
-        return CasePriorityResponse(
+        return CasePriorityResponse.model_construct(
             model_version=MODEL_VERSION,
             band=band,
             score=score,
@@ -86,24 +175,27 @@ async def score_case_priority(request: CasePriorityRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@app.post("/ml/score/fraud", response_model=FraudDocResponse)
-async def score_fraud(request: FraudDocRequest):
+@app.post(
+    "/ml/score/fraud",
+    response_model=FraudDocResponse,
+    openapi_extra=json_body(FraudDocRequest)
+)
+async def score_fraud(http_request: Request):
     """UC-7: Fraud Detection
     
     Returns quarantine decision and fraud risk assessment
     """
+    request = await parse_body(http_request, FraudDocRequest)
+    
     try:
         # Extract features
-        request_dict = request.model_dump()
-        features = feature_extractor.extract(request_dict, "uc_7")
+        features = feature_extractor.extract_from_model(request, "uc_7")
         
-        # Get prediction and SHAP values
-        probs, shap_values = registry.predict("uc_7", features)
+        # Get prediction and SHAP values (batched with concurrent requests, off the event loop)
+        probs, shap_values = await batcher.predict("uc_7", features)
         
         # Binary classification: fraudulent=1, legitimate=0
-        prob_fraudulent = float(probs[0, 1])
-        prob_legitimate = float(probs[0, 0])
-        
+        prob_legitimate, prob_fraudulent = probs[0].tolist()
         probs_dict = {
             "fraudulent": prob_fraudulent,
             "legitimate": prob_legitimate
@@ -115,7 +207,7 @@ async def score_fraud(request: FraudDocRequest):
         # Get top SHAP features
         shap_top = registry.get_top_shap_features("uc_7", shap_values, features, top_k=5)
         
-        return FraudDocResponse(
+        return FraudDocResponse.model_construct(
             model_version=MODEL_VERSION,
             decision=decision,
             quarantine=quarantine,
@@ -128,48 +220,44 @@ async def score_fraud(request: FraudDocRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@app.post("/ml/score/compliance", response_model=ObligationComplianceResponse)
-async def score_compliance(request: ObligationComplianceRequest):
+@app.post(
+    "/ml/score/compliance",
+    response_model=ObligationComplianceResponse,
+    openapi_extra=json_body(ObligationComplianceRequest)
+)
+async def score_compliance(http_request: Request):
     """UC-12: Obligation Compliance Scoring
     
     Returns compliance risk band and entitlement assessment
     """
+    request = await parse_body(http_request, ObligationComplianceRequest)
+    
     try:
         # Extract features
-        request_dict = request.model_dump()
-        features = feature_extractor.extract(request_dict, "uc_12")
+        features = feature_extractor.extract_from_model(request, "uc_12")
         
-        # Get prediction and SHAP values
-        probs, shap_values = registry.predict("uc_12", features)
+        # Get prediction and SHAP values (batched with concurrent requests, off the event loop)
+        probs, shap_values = await batcher.predict("uc_12", features)
         
         # Binary classification: non-compliant=1, compliant=0
-        prob_high_risk = float(probs[0, 1])
-        prob_compliant = float(probs[0, 0])
-        
         # Split compliant into medium/low
-        prob_medium_risk = prob_compliant * 0.3
-        prob_low_risk = prob_compliant * 0.7
-        
+        prob_compliant, prob_high_risk = probs[0].tolist()
         probs_dict = {
             "high_risk": prob_high_risk,
-            "medium_risk": prob_medium_risk,
-            "low_risk": prob_low_risk
+            "medium_risk": prob_compliant * 0.3,
+            "low_risk": prob_compliant * 0.7
         }
         
-        # Determine if WorkCover case (simple heuristic)
-        is_workcover = request_dict.get("case_id", "").startswith("WC") or \
-                      request_dict.get("missed_appts_7d", 0) > 2
-        
         # Apply policy
         band, entitlement_risk, evidence_log, recommendation = uc12_policy(
             probs_dict, 
-            is_workcover
+            request.is_workcover
         )
         
         # Get top SHAP features
         shap_top = registry.get_top_shap_features("uc_12", shap_values, features, top_k=5)
         
-        return ObligationComplianceResponse(
+        return ObligationComplianceResponse.model_construct(
             model_version=MODEL_VERSION,
             band=band,
             probabilities=probs_dict,
@@ -183,32 +271,32 @@ async def score_compliance(request: ObligationComplianceRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@app.post("/ml/score/claim-escalation", response_model=ClaimEscalationResponse)
-async def score_claim_escalation(request: ClaimEscalationRequest):
+@app.post(
+    "/ml/score/claim-escalation",
+    response_model=ClaimEscalationResponse,
+    openapi_extra=json_body(ClaimEscalationRequest)
+)
+async def score_claim_escalation(http_request: Request):
     """UC-13: Claim Escalation Risk
     
     Returns escalation risk band and intervention recommendation
     """
+    request = await parse_body(http_request, ClaimEscalationRequest)
+    
     try:
         # Extract features
-        request_dict = request.model_dump()
-        features = feature_extractor.extract(request_dict, "uc_13")
+        features = feature_extractor.extract_from_model(request, "uc_13")
         
-        # Get prediction and SHAP values
-        probs, shap_values = registry.predict("uc_13", features)
+        # Get prediction and SHAP values (batched with concurrent requests, off the event loop)
+        probs, shap_values = await batcher.predict("uc_13", features)
         
         # Binary classification: escalates=1, stable=0
-        prob_high_risk = float(probs[0, 1])
-        prob_stable = float(probs[0, 0])
-        
         # Split stable into medium/low
-        prob_medium_risk = prob_stable * 0.4
-        prob_low_risk = prob_stable * 0.6
-        
+        prob_stable, prob_high_risk = probs[0].tolist()
         probs_dict = {
             "high_risk": prob_high_risk,
-            "medium_risk": prob_medium_risk,
-            "low_risk": prob_low_risk
+            "medium_risk": prob_stable * 0.4,
+            "low_risk": prob_stable * 0.6
         }
         
         # Apply policy
@@ -217,7 +305,7 @@ async def score_claim_escalation(request: ClaimEscalationRequest):
         # Get top SHAP features
         shap_top = registry.get_top_shap_features("uc_13", shap_values, features, top_k=5)
         
-        return ClaimEscalationResponse(
+        return ClaimEscalationResponse.model_construct(
             model_version=MODEL_VERSION,
             band=band,
             probabilities=probs_dict,
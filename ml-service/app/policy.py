@@ -1,19 +1,51 @@
 """Policy engine for banding, guardrails, and recommendations"""
+import re
 from typing import Dict, Any, List, Tuple, Optional
-from app.config import *
+from app.config import (
+    LEGAL_THREAT_KEYWORDS,
+    UC1_HIGH_THRESHOLD, UC1_MEDIUM_THRESHOLD,
+    UC2_ESCALATE_THRESHOLD,
+    UC3_INCIDENT_THRESHOLD,
+    UC5_SEND_THRESHOLD, UC5_CONFIDENCE_THRESHOLD,
+    UC6_HIGH_RISK_THRESHOLD,
+    UC7_QUARANTINE_THRESHOLD,
+    UC8_QUARANTINE_THRESHOLD,
+    UC10_NONFIT_THRESHOLD,
+    UC11_WORK_THRESHOLD, UC11_UNCLEAR_LOW, UC11_UNCLEAR_HIGH,
+    UC12_HIGH_RISK_THRESHOLD, UC12_MEDIUM_RISK_THRESHOLD,
+    UC13_HIGH_RISK_THRESHOLD, UC13_MEDIUM_RISK_THRESHOLD
+)
+
+
+# Single-pass matcher for all legal threat keywords, one named group per
+# keyword so a match maps to its reason without re-reading the user's text.
+# Keywords must start at a word boundary ("issue" no longer hits "sue") but
+# may carry a suffix, so inflections like "lawyers" and "lawsuits" still match
+_LEGAL_RE = re.compile(
+    r"\b(?:" + "|".join(
+        f"(?P<kw{i}>{re.escape(keyword)})" for i, keyword in enumerate(LEGAL_THREAT_KEYWORDS)
+    ) + r")",
+    re.IGNORECASE
+)
+
+# Guardrail reason codes by keyword group, built once rather than per match
+_LEGAL_THREAT_REASONS = {
+    f"kw{i}": f"guardrail:legal_threat:{keyword.lower()}"
+    for i, keyword in enumerate(LEGAL_THREAT_KEYWORDS)
+}
+_LEGAL_THREAT_RECOMMENDATION = "Legal threat detected - requires immediate manual review"
 
 
 def check_guardrails(text: Optional[str] = None, fields: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
     """Check for guardrail conditions that force manual review"""
     if text:
-        text_lower = text.lower()
-        for keyword in LEGAL_THREAT_KEYWORDS:
-            if keyword in text_lower:
-                return {
-                    "force_decision": "Hold/Manual",
-                    "reason": f"guardrail:legal_threat:{keyword}",
-                    "recommendation": "Legal threat detected - requires immediate manual review"
-                }
+        match = _LEGAL_RE.search(text)
+        if match:
+            return {
+                "force_decision": "Hold/Manual",
+                "reason": _LEGAL_THREAT_REASONS[match.lastgroup],
+                "recommendation": _LEGAL_THREAT_RECOMMENDATION
+            }
     
     if fields:
         if not fields.get("case_id"):
@@ -26,14 +58,27 @@ def check_guardrails(text: Optional[str] = None, fields: Optional[Dict] = None)
     return None
 
 
+# Band tables indexed by level (0 = lowest); each rung of a policy ladder
+# checks a different class probability, so the level is picked by plain
+# comparisons and the strings come from these shared tuples
+_UC1_BANDS = (
+    ("green", "Routine monitoring; low priority"),
+    ("yellow", "Review this week; medium priority"),
+    ("red", "Review today; high priority case"),
+)
+_UC1_SCORE_KEYS = ("low", "medium", "high")
+
+
 def uc1_policy(probs: Dict[str, float]) -> Tuple[str, int, str]:
     """UC-1: Case Priority - High/Medium/Low"""
     if probs["high"] >= UC1_HIGH_THRESHOLD:
-        return "red", int(probs["high"] * 100), "Review today; high priority case"
+        level = 2
     elif probs["medium"] >= UC1_MEDIUM_THRESHOLD:
-        return "yellow", int(probs["medium"] * 100), "Review this week; medium priority"
+        level = 1
     else:
-        return "green", int(probs["low"] * 100), "Routine monitoring; low priority"
+        level = 0
+    band, recommendation = _UC1_BANDS[level]
+    return band, int(probs[_UC1_SCORE_KEYS[level]] * 100), recommendation
 
 
 def uc2_policy(probs: Dict[str, float]) -> Tuple[str, str]:
@@ -52,6 +97,9 @@ def uc3_policy(probs: Dict[str, float]) -> Tuple[str, str]:
         return "Prevention", "Route to pre-employment/prevention workflow"
 
 
+_UC4_COMPLETE = ("Complete", "All critical documents present")
+
+
 def uc4_policy(probs: Dict[str, float], features: Dict[str, Any]) -> Tuple[str, List[str], str]:
     """UC-4: Document Completeness - Complete/Missing"""
     missing = []
@@ -67,8 +115,7 @@ def uc4_policy(probs: Dict[str, float], features: Dict[str, Any]) -> Tuple[str,
         decision = "Missing Critical"
         recommendation = f"Request: {', '.join(missing)}"
     else:
-        decision = "Complete"
-        recommendation = "All critical documents present"
+        decision, recommendation = _UC4_COMPLETE
     
     return decision, missing, recommendation
 
@@ -89,14 +136,21 @@ def uc5_policy(probs: Dict[str, float], confidence: float) -> Tuple[str, str, st
     return decision, recommendation, template, tone
 
 
+_UC6_BANDS = (
+    ("Low Risk", "Proceed with standard communication"),
+    ("Medium Risk", "Review tone and phrasing before sending"),
+    ("High Risk", "Rewrite with empathetic tone; avoid accusatory language"),
+)
+
+
 def uc6_policy(probs: Dict[str, float]) -> Tuple[str, str]:
     """UC-6: Complaint Risk - High/Medium/Low"""
     if probs["high_risk"] >= UC6_HIGH_RISK_THRESHOLD:
-        return "High Risk", "Rewrite with empathetic tone; avoid accusatory language"
+        return _UC6_BANDS[2]
     elif probs["medium_risk"] >= 0.40:
-        return "Medium Risk", "Review tone and phrasing before sending"
+        return _UC6_BANDS[1]
     else:
-        return "Low Risk", "Proceed with standard communication"
+        return _UC6_BANDS[0]
 
 
 def uc7_policy(probs: Dict[str, float]) -> Tuple[bool, str, str]:
@@ -115,21 +169,22 @@ def uc8_policy(probs: Dict[str, float]) -> Tuple[bool, str, str]:
         return False, "Legitimate", "Email appears legitimate"
 
 
+# UC-9 benchmark recovery weeks by injury type
+_UC9_BENCHMARKS = {
+    "back": 8,
+    "shoulder": 10,
+    "knee": 12,
+    "psychological": 16
+}
+
+
 def uc9_policy(predicted_weeks: float, injury_type: str) -> Tuple[float, float, float, bool, str]:
     """UC-9: Recovery Timeline - Expected weeks with CI"""
     # Simple confidence interval (80%)
     ci_lower = predicted_weeks * 0.8
     ci_upper = predicted_weeks * 1.2
     
-    # Benchmark delays by injury type
-    benchmarks = {
-        "back": 8,
-        "shoulder": 10,
-        "knee": 12,
-        "psychological": 16
-    }
-    
-    benchmark = benchmarks.get(injury_type, 10)
+    benchmark = _UC9_BENCHMARKS.get(injury_type, 10)
     delayed = predicted_weeks > benchmark * 1.3
     
     if delayed:
@@ -158,39 +213,45 @@ def uc11_policy(probs: Dict[str, float]) -> Tuple[str, str]:
         return "Non-Work", "Likely non-occupational injury"
 
 
+_UC12_BANDS = (
+    ("Compliant", "Worker is meeting obligations"),
+    ("Medium Risk", "Increase monitoring; document all interactions"),
+    ("High Risk", "Generate reasonable directives checklist"),
+)
+_UC12_HIGH_RISK_EVIDENCE = (
+    "Compile missed appointment log",
+    "Document refused suitable duties",
+    "Record communication delays"
+)
+
+
 def uc12_policy(probs: Dict[str, float], is_workcover: bool) -> Tuple[str, bool, List[str], str]:
     """UC-12: Obligation Compliance"""
     if probs["high_risk"] >= UC12_HIGH_RISK_THRESHOLD:
-        band = "High Risk"
-        entitlement_risk = True
-        evidence = [
-            "Compile missed appointment log",
-            "Document refused suitable duties",
-            "Record communication delays"
-        ]
+        band, recommendation = _UC12_BANDS[2]
         if is_workcover:
             recommendation = "Flag entitlement at risk; prepare evidence for insurer"
-        else:
-            recommendation = "Generate reasonable directives checklist"
+        return band, True, list(_UC12_HIGH_RISK_EVIDENCE), recommendation
     elif probs["medium_risk"] >= UC12_MEDIUM_RISK_THRESHOLD:
-        band = "Medium Risk"
-        entitlement_risk = False
-        evidence = []
-        recommendation = "Increase monitoring; document all interactions"
+        band, recommendation = _UC12_BANDS[1]
     else:
-        band = "Compliant"
-        entitlement_risk = False
-        evidence = []
-        recommendation = "Worker is meeting obligations"
+        band, recommendation = _UC12_BANDS[0]
     
-    return band, entitlement_risk, evidence, recommendation
+    return band, False, [], recommendation
+
+
+_UC13_BANDS = (
+    ("Low Risk", "Unlikely to escalate to formal claim"),
+    ("Medium Risk", "Monitor closely; supportive communication recommended"),
+    ("High Risk", "⚠️ Likely to become WorkCover claim - early intervention critical"),
+)
 
 
 def uc13_policy(probs: Dict[str, float]) -> Tuple[str, str]:
     """UC-13: Claim Escalation Risk"""
     if probs["high_risk"] >= UC13_HIGH_RISK_THRESHOLD:
-        return "High Risk", "⚠️ Likely to become WorkCover claim - early intervention critical"
+        return _UC13_BANDS[2]
     elif probs["medium_risk"] >= UC13_MEDIUM_RISK_THRESHOLD:
-        return "Medium Risk", "Monitor closely; supportive communication recommended"
+        return _UC13_BANDS[1]
     else:
-        return "Low Risk", "Unlikely to escalate to formal claim"
+        return _UC13_BANDS[0]
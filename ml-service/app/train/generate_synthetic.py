@@ -2,138 +2,143 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Dict
 from app.config import DEMO_DATA_DIR
 
-np.random.seed(42)
+SEED = 42
 
-def generate_uc1_data(n=800):
-    """UC-1: Case Priority"""
-    data = []
-    for _ in range(n):
-        days_open = np.random.randint(0, 60)
-        sla_breaches = np.random.poisson(0.3)
-        sentiment = np.random.normal(-0.2, 0.4)
-        injury_terms = np.random.poisson(2)
-        prior_esc = np.random.poisson(0.5)
-        
+# Per-UC generator specs, in generation order (they share one RNG stream):
+#   draws: (distribution, column names, params) in draw order. Several names
+#          take one joint (n, k) draw; "bernoulli" params are P(1) per column
+#   derived: optional columns computed from the drawn ones
+#   columns: dataset column order (the model's feature order)
+#   score / label: synthetic risk score and the target derived from it
+UC_GEN_SPECS = {
+    # UC-1: Case Priority
+    "uc_1": {
+        "n": 800,
+        "draws": [
+            ("integers", ("days_open",), (0, 60)),
+            ("normal", ("sentiment_compound",), (-0.2, 0.4)),
+            ("poisson", ("sla_breaches", "injury_terms_count", "prior_escalations"), ([0.3, 2, 0.5],)),
+        ],
+        "columns": ["days_open", "sla_breaches", "sentiment_compound",
+                    "injury_terms_count", "prior_escalations"],
         # Label: high if multiple risk factors
-        score = days_open * 0.02 - sentiment * 0.5 + injury_terms * 0.1 + prior_esc * 0.3 + sla_breaches * 0.2
-        if score > 2.5:
-            label = 2  # high
-        elif score > 1.2:
-            label = 1  # medium
+        "score": lambda c: (c["days_open"] * 0.02 - c["sentiment_compound"] * 0.5 +
+                            c["injury_terms_count"] * 0.1 + c["prior_escalations"] * 0.3 +
+                            c["sla_breaches"] * 0.2),
+        "label": lambda s: np.where(s > 2.5, 2, np.where(s > 1.2, 1, 0)),  # high / medium / low
+        "target": "priority",
+    },
+    # UC-13: Claim Escalation
+    "uc_13": {
+        "n": 800,
+        "draws": [
+            ("poisson", ("keyword_lawyer", "keyword_claim", "doctor_changes_count"), ([0.2, 0.3, 0.5],)),
+            ("normal", ("neg_sentiment_trend_7d",), (0, 0.3)),
+            ("bernoulli", ("diagnostic_delay_flag", "refused_duties_flag"), [0.2, 0.3]),
+            ("integers", ("injury_severity_scale",), (1, 5)),
+            ("integers", ("imaging_delay_days",), (0, 30)),
+        ],
+        "columns": ["keyword_lawyer", "keyword_claim", "neg_sentiment_trend_7d",
+                    "diagnostic_delay_flag", "refused_duties_flag", "injury_severity_scale",
+                    "imaging_delay_days", "doctor_changes_count"],
+        # Label: escalates if multiple red flags
+        "score": lambda c: (c["keyword_lawyer"] * 0.4 + c["keyword_claim"] * 0.3 -
+                            c["neg_sentiment_trend_7d"] * 0.2 + c["diagnostic_delay_flag"] * 0.3 +
+                            c["refused_duties_flag"] * 0.3 + c["injury_severity_scale"] * 0.1 +
+                            (c["imaging_delay_days"] > 14) * 0.2 + c["doctor_changes_count"] * 0.15),
+        "label": lambda s: (s > 1.5).astype(np.int8),
+        "target": "escalation",
+    },
+    # UC-7: Fraud
+    "uc_7": {
+        "n": 600,
+        "draws": [
+            ("beta", ("ocr_text_mismatch_rate",), (2, 8)),  # Most low, some high
+            ("bernoulli", ("doc_hash_repeat", "font_anomaly_flag", "provider_abn_match"), [0.1, 0.15, 0.9]),
+            ("poisson", ("doctor_changes_count",), (0.3,)),
+        ],
+        "columns": ["ocr_text_mismatch_rate", "doc_hash_repeat", "font_anomaly_flag",
+                    "provider_abn_match", "doctor_changes_count"],
+        # Fraud if multiple anomalies
+        "score": lambda c: (c["ocr_text_mismatch_rate"] * 0.4 + c["doc_hash_repeat"] * 0.3 +
+                            c["font_anomaly_flag"] * 0.25 + (1 - c["provider_abn_match"]) * 0.4 +
+                            c["doctor_changes_count"] * 0.1),
+        "label": lambda s: (s > 0.6).astype(np.int8),
+        "target": "fraudulent",
+    },
+    # UC-12: Compliance
+    "uc_12": {
+        "n": 700,
+        "draws": [
+            ("poisson", ("missed_appts_7d", "missed_appts_30d"), ([0.3, 1.2],)),
+            ("bernoulli", ("refused_duties_flag", "communication_breakdown_flag"), [0.25, 0.15]),
+            ("exponential", ("avg_response_latency_mins",), (120,)),
+            ("beta", ("checkin_completion_rate",), (8, 2)),
+        ],
+        "derived": lambda c: {"consecutive_missed_appts": np.minimum(c["missed_appts_7d"], 3)},
+        "columns": ["missed_appts_7d", "missed_appts_30d", "consecutive_missed_appts",
+                    "refused_duties_flag", "avg_response_latency_mins", "checkin_completion_rate",
+                    "communication_breakdown_flag"],
+        # Non-compliance if multiple issues
+        "score": lambda c: (c["missed_appts_7d"] * 0.2 + c["missed_appts_30d"] * 0.1 +
+                            c["consecutive_missed_appts"] * 0.25 + c["refused_duties_flag"] * 0.3 +
+                            (c["avg_response_latency_mins"] > 300) * 0.2 +
+                            (1 - c["checkin_completion_rate"]) * 0.3 +
+                            c["communication_breakdown_flag"] * 0.35),
+        "label": lambda s: (s > 0.7).astype(np.int8),
+        "target": "noncompliant",
+    },
+}
+
+
+def _generate(spec: dict, rng: np.random.Generator) -> pd.DataFrame:
+    """Generate one UC's dataset from its spec"""
+    n = spec["n"]
+    
+    cols = {}
+    for dist, names, params in spec["draws"]:
+        if dist == "bernoulli":
+            values = (rng.random((n, len(names))) < params).astype(np.int8).T
+        elif len(names) > 1:
+            values = getattr(rng, dist)(*params, size=(n, len(names))).T
         else:
-            label = 0  # low
-        
-        data.append([days_open, sla_breaches, sentiment, injury_terms, prior_esc, label])
+            values = [getattr(rng, dist)(*params, size=n)]
+        cols.update(zip(names, values))
     
-    df = pd.DataFrame(data, columns=['days_open', 'sla_breaches', 'sentiment_compound', 'injury_terms_count', 'prior_escalations', 'priority'])
-    return df
-
-def generate_uc13_data(n=800):
-    """UC-13: Claim Escalation Risk"""
-    data = []
-    for _ in range(n):
-        lawyer_mentions = np.random.poisson(0.2)
-        claim_mentions = np.random.poisson(0.3)
-        neg_trend = np.random.normal(0, 0.3)
-        diag_delay = np.random.choice([0, 1], p=[0.8, 0.2])
-        refused_duties = np.random.choice([0, 1], p=[0.7, 0.3])
-        severity = np.random.randint(1, 5)
-        imaging_delay = np.random.randint(0, 30)
-        doctor_changes = np.random.poisson(0.5)
-        
-        # Label: escalates if multiple red flags
-        score = (lawyer_mentions * 0.4 + claim_mentions * 0.3 - neg_trend * 0.2 +
-                 diag_delay * 0.3 + refused_duties * 0.3 + severity * 0.1 + 
-                 (imaging_delay > 14) * 0.2 + doctor_changes * 0.15)
-        
-        label = 1 if score > 1.5 else 0
-        
-        data.append([lawyer_mentions, claim_mentions, neg_trend, diag_delay, 
-                    refused_duties, severity, imaging_delay, doctor_changes, label])
+    if "derived" in spec:
+        cols.update(spec["derived"](cols))
     
-    df = pd.DataFrame(data, columns=[
-        'keyword_lawyer', 'keyword_claim', 'neg_sentiment_trend_7d', 
-        'diagnostic_delay_flag', 'refused_duties_flag', 'injury_severity_scale',
-        'imaging_delay_days', 'doctor_changes_count', 'escalation'
-    ])
-    return df
-
-def generate_uc7_data(n=600):
-    """UC-7: Fraud Detection"""
-    data = []
-    for _ in range(n):
-        ocr_mismatch = np.random.beta(2, 8)  # Most low, some high
-        doc_repeat = np.random.choice([0, 1], p=[0.9, 0.1])
-        font_anomaly = np.random.choice([0, 1], p=[0.85, 0.15])
-        abn_match = np.random.choice([0, 1], p=[0.1, 0.9])
-        doctor_changes = np.random.poisson(0.3)
-        
-        # Fraud if multiple anomalies
-        score = ocr_mismatch * 0.4 + doc_repeat * 0.3 + font_anomaly * 0.25 + (1 - abn_match) * 0.4 + doctor_changes * 0.1
-        label = 1 if score > 0.6 else 0
-        
-        data.append([ocr_mismatch, doc_repeat, font_anomaly, abn_match, doctor_changes, label])
+    label = spec["label"](spec["score"](cols))
     
-    df = pd.DataFrame(data, columns=[
-        'ocr_text_mismatch_rate', 'doc_hash_repeat', 'font_anomaly_flag',
-        'provider_abn_match', 'doctor_changes_count', 'fraudulent'
-    ])
+    df = pd.DataFrame({name: cols[name] for name in spec["columns"]})
+    df[spec["target"]] = label
     return df
 
-def generate_uc12_data(n=700):
-    """UC-12: Obligation Compliance"""
-    data = []
-    for _ in range(n):
-        missed_7d = np.random.poisson(0.3)
-        missed_30d = np.random.poisson(1.2)
-        consecutive = min(missed_7d, 3)
-        refused_duties = np.random.choice([0, 1], p=[0.75, 0.25])
-        latency = np.random.exponential(120)
-        completion = np.random.beta(8, 2)
-        breakdown = np.random.choice([0, 1], p=[0.85, 0.15])
-        
-        # Non-compliance if multiple issues
-        score = missed_7d * 0.2 + missed_30d * 0.1 + consecutive * 0.25 + refused_duties * 0.3 + (latency > 300) * 0.2 + (1 - completion) * 0.3 + breakdown * 0.35
-        label = 1 if score > 0.7 else 0
-        
-        data.append([missed_7d, missed_30d, consecutive, refused_duties, latency, completion, breakdown, label])
-    
-    df = pd.DataFrame(data, columns=[
-        'missed_appts_7d', 'missed_appts_30d', 'consecutive_missed_appts',
-        'refused_duties_flag', 'avg_response_latency_mins', 'checkin_completion_rate',
-        'communication_breakdown_flag', 'noncompliant'
-    ])
-    return df
 
-def generate_all_datasets():
-    """Generate and save all synthetic datasets"""
-    DEMO_DATA_DIR.mkdir(parents=True, exist_ok=True)
+def generate_all_datasets(seed: int = SEED, save: bool = True) -> Dict[str, pd.DataFrame]:
+    """Generate all synthetic datasets, keyed by UC id (CSVs written if save)"""
+    if save:
+        DEMO_DATA_DIR.mkdir(parents=True, exist_ok=True)
     
-    print("Generating synthetic training data...")
+    # One generator shared by all UCs keeps the output deterministic
+    rng = np.random.default_rng(seed)
     
-    # UC-1: Case Priority
-    df1 = generate_uc1_data()
-    df1.to_csv(DEMO_DATA_DIR / "uc_1.csv", index=False)
-    print(f"✅ UC-1: {len(df1)} samples")
-    
-    # UC-13: Claim Escalation
-    df13 = generate_uc13_data()
-    df13.to_csv(DEMO_DATA_DIR / "uc_13.csv", index=False)
-    print(f"✅ UC-13: {len(df13)} samples")
+    print("Generating synthetic training data...")
     
-    # UC-7: Fraud
-    df7 = generate_uc7_data()
-    df7.to_csv(DEMO_DATA_DIR / "uc_7.csv", index=False)
-    print(f"✅ UC-7: {len(df7)} samples")
+    datasets = {}
+    for uc_id, spec in UC_GEN_SPECS.items():
+        datasets[uc_id] = _generate(spec, rng)
+        print(f"✅ {uc_id.upper().replace('_', '-')}: {len(datasets[uc_id])} samples")
     
-    # UC-12: Compliance
-    df12 = generate_uc12_data()
-    df12.to_csv(DEMO_DATA_DIR / "uc_12.csv", index=False)
-    print(f"✅ UC-12: {len(df12)} samples")
+    if save:
+        for uc_id, df in datasets.items():
+            df.to_csv(DEMO_DATA_DIR / f"{uc_id}.csv", index=False)
     
     print("\n🎉 All synthetic datasets generated!")
+    return datasets
 
 if __name__ == "__main__":
     generate_all_datasets()
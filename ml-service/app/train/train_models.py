@@ -1,4 +1,6 @@
 """Train XGBoost models for UC-1, UC-7, UC-12, UC-13"""
+import json
+import os
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -6,7 +8,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 import numpy as np
 import pandas as pd
 import joblib
-import shap
+from joblib import Parallel, delayed
 from app.train.generate_synthetic import generate_all_datasets
 from app.train.utils import (
     load_dataset, time_based_split, train_classifier,
@@ -16,192 +18,95 @@ from app.config import MODELS_DIR, DEMO_DATA_DIR, MODEL_VERSION
 from app.features import feature_extractor
 
 
-def train_uc1():
-    """Train UC-1: Case Priority (multiclass)"""
-    print("\n" + "="*60)
-    print("Training UC-1: Case Priority")
-    print("="*60)
-    
-    # Load data
-    csv_path = DEMO_DATA_DIR / "uc_1.csv"
-    X, y = load_dataset(str(csv_path))
-    
-    # Map to binary for training (high=1, medium/low=0)
-    y_binary = (y == 2).astype(int)
-    
-    # Split data
-    X_train, X_val, X_test, y_train, y_val, y_test = time_based_split(X, y_binary)
-    
-    print(f"Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
-    print(f"Positive rate: {y_binary.mean():.3f}")
-    
-    # Train model
-    model, calibrator = train_classifier(X_train, y_train, X_val, y_val)
-    
-    # Evaluate
-    metrics = compute_classifier_metrics(model, calibrator, X_test, y_test)
-    print(f"\n✅ UC-1 Metrics:")
-    print(f"   AUC: {metrics['auc']:.3f}")
-    print(f"   PR-AUC: {metrics['pr_auc']:.3f}")
-    print(f"   F1: {metrics['f1']:.3f}")
-    print(f"   ECE: {metrics['ece']:.3f}")
-    
-    # Create SHAP explainer
-    explainer = shap.TreeExplainer(model)
-    
-    # Save artifacts
-    output_dir = MODELS_DIR / "uc_1"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    joblib.dump(model, output_dir / "model.pkl")
-    joblib.dump(calibrator, output_dir / "calibrator.pkl")
-    joblib.dump(explainer, output_dir / "explainer.pkl")
-    joblib.dump(metrics, output_dir / "metrics.json")
-    
-    # Save feature order
-    feature_order = list(X.columns)
-    joblib.dump(feature_order, output_dir / "feature_order.pkl")
-    
-    print(f"💾 Saved to {output_dir}")
-    return metrics
-
+# Per-UC training specs: CSV, display name, label for the positive rate,
+# and an optional transform mapping raw labels onto the binary target
+UC_SPECS = [
+    {
+        "id": "uc_1",
+        "csv": "uc_1.csv",
+        "name": "Case Priority",
+        "rate_label": "Positive rate",
+        # Map to binary for training (high=1, medium/low=0)
+        "y_transform": lambda y: (y == 2).astype(int),
+    },
+    {
+        "id": "uc_7",
+        "csv": "uc_7.csv",
+        "name": "Fraud Detection",
+        "rate_label": "Fraud rate",
+        "y_transform": None,
+    },
+    {
+        "id": "uc_12",
+        "csv": "uc_12.csv",
+        "name": "Obligation Compliance",
+        "rate_label": "Non-compliance rate",
+        "y_transform": None,
+    },
+    {
+        "id": "uc_13",
+        "csv": "uc_13.csv",
+        "name": "Claim Escalation Risk",
+        "rate_label": "Escalation rate",
+        "y_transform": None,
+    },
+]
 
-def train_uc7():
-    """Train UC-7: Fraud Detection (binary)"""
-    print("\n" + "="*60)
-    print("Training UC-7: Fraud Detection")
-    print("="*60)
-    
-    # Load data
-    csv_path = DEMO_DATA_DIR / "uc_7.csv"
-    X, y = load_dataset(str(csv_path))
-    
-    # Split data
-    X_train, X_val, X_test, y_train, y_val, y_test = time_based_split(X, y)
-    
-    print(f"Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
-    print(f"Fraud rate: {y.mean():.3f}")
-    
-    # Train model
-    model, calibrator = train_classifier(X_train, y_train, X_val, y_val)
-    
-    # Evaluate
-    metrics = compute_classifier_metrics(model, calibrator, X_test, y_test)
-    print(f"\n✅ UC-7 Metrics:")
-    print(f"   AUC: {metrics['auc']:.3f}")
-    print(f"   PR-AUC: {metrics['pr_auc']:.3f}")
-    print(f"   F1: {metrics['f1']:.3f}")
-    print(f"   ECE: {metrics['ece']:.3f}")
-    
-    # Create SHAP explainer
-    explainer = shap.TreeExplainer(model)
-    
-    # Save artifacts
-    output_dir = MODELS_DIR / "uc_7"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    joblib.dump(model, output_dir / "model.pkl")
-    joblib.dump(calibrator, output_dir / "calibrator.pkl")
-    joblib.dump(explainer, output_dir / "explainer.pkl")
-    joblib.dump(metrics, output_dir / "metrics.json")
-    
-    # Save feature order
-    feature_order = list(X.columns)
-    joblib.dump(feature_order, output_dir / "feature_order.pkl")
-    
-    print(f"💾 Saved to {output_dir}")
-    return metrics
+# The trainings are independent, so run one per worker process and split
+# the cores between them to keep XGBoost from oversubscribing the CPU
+TRAIN_WORKERS = min(len(UC_SPECS), os.cpu_count() or 1)
+XGB_THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // TRAIN_WORKERS)
 
 
-def train_uc12():
-    """Train UC-12: Obligation Compliance (binary)"""
-    print("\n" + "="*60)
-    print("Training UC-12: Obligation Compliance")
-    print("="*60)
-    
-    # Load data
-    csv_path = DEMO_DATA_DIR / "uc_12.csv"
-    X, y = load_dataset(str(csv_path))
-    
-    # Split data
-    X_train, X_val, X_test, y_train, y_val, y_test = time_based_split(X, y)
-    
-    print(f"Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
-    print(f"Non-compliance rate: {y.mean():.3f}")
+def train_uc(spec: dict, df: pd.DataFrame = None, n_jobs: int = None) -> dict:
+    """Train, evaluate and save one use case (binary classifier)
     
-    # Train model
-    model, calibrator = train_classifier(X_train, y_train, X_val, y_val)
-    
-    # Evaluate
-    metrics = compute_classifier_metrics(model, calibrator, X_test, y_test)
-    print(f"\n✅ UC-12 Metrics:")
-    print(f"   AUC: {metrics['auc']:.3f}")
-    print(f"   PR-AUC: {metrics['pr_auc']:.3f}")
-    print(f"   F1: {metrics['f1']:.3f}")
-    print(f"   ECE: {metrics['ece']:.3f}")
-    
-    # Create SHAP explainer
-    explainer = shap.TreeExplainer(model)
-    
-    # Save artifacts
-    output_dir = MODELS_DIR / "uc_12"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    Trains on df when given, otherwise reads the UC's CSV from DEMO_DATA_DIR.
+    """
+    uc_id = spec["id"]
+    uc_title = uc_id.upper().replace("_", "-")
     
-    joblib.dump(model, output_dir / "model.pkl")
-    joblib.dump(calibrator, output_dir / "calibrator.pkl")
-    joblib.dump(explainer, output_dir / "explainer.pkl")
-    joblib.dump(metrics, output_dir / "metrics.json")
-    
-    # Save feature order
-    feature_order = list(X.columns)
-    joblib.dump(feature_order, output_dir / "feature_order.pkl")
-    
-    print(f"💾 Saved to {output_dir}")
-    return metrics
-
-
-def train_uc13():
-    """Train UC-13: Claim Escalation (binary)"""
     print("\n" + "="*60)
-    print("Training UC-13: Claim Escalation Risk")
+    print(f"Training {uc_title}: {spec['name']}")
     print("="*60)
     
     # Load data
-    csv_path = DEMO_DATA_DIR / "uc_13.csv"
-    X, y = load_dataset(str(csv_path))
+    X, y = load_dataset(df if df is not None else DEMO_DATA_DIR / spec["csv"])
+    if spec["y_transform"] is not None:
+        y = spec["y_transform"](y)
+    # Binary 0/1 classification target
+    y = y.astype(np.int8, copy=False)
     
     # Split data
     X_train, X_val, X_test, y_train, y_val, y_test = time_based_split(X, y)
     
     print(f"Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
-    print(f"Escalation rate: {y.mean():.3f}")
+    print(f"{spec['rate_label']}: {y.mean():.3f}")
     
     # Train model
-    model, calibrator = train_classifier(X_train, y_train, X_val, y_val)
+    model, calibrator = train_classifier(X_train, y_train, X_val, y_val, n_jobs=n_jobs)
     
     # Evaluate
     metrics = compute_classifier_metrics(model, calibrator, X_test, y_test)
-    print(f"\n✅ UC-13 Metrics:")
+    print(f"\n✅ {uc_title} Metrics:")
     print(f"   AUC: {metrics['auc']:.3f}")
     print(f"   PR-AUC: {metrics['pr_auc']:.3f}")
     print(f"   F1: {metrics['f1']:.3f}")
     print(f"   ECE: {metrics['ece']:.3f}")
     
-    # Create SHAP explainer
-    explainer = shap.TreeExplainer(model)
-    
     # Save artifacts
-    output_dir = MODELS_DIR / "uc_13"
+    output_dir = MODELS_DIR / uc_id
     output_dir.mkdir(parents=True, exist_ok=True)
     
     joblib.dump(model, output_dir / "model.pkl")
     joblib.dump(calibrator, output_dir / "calibrator.pkl")
-    joblib.dump(explainer, output_dir / "explainer.pkl")
-    joblib.dump(metrics, output_dir / "metrics.json")
+    with open(output_dir / "metrics.json", "w") as f:
+        json.dump(metrics, f, indent=2)
     
     # Save feature order
     feature_order = list(X.columns)
-    joblib.dump(feature_order, output_dir / "feature_order.pkl")
+    with open(output_dir / "feature_order.json", "w") as f:
+        json.dump(feature_order, f)
     
     print(f"💾 Saved to {output_dir}")
     return metrics
@@ -213,18 +118,17 @@ def main():
     print(f"Model Version: {MODEL_VERSION}")
     print(f"Output Directory: {MODELS_DIR}")
     
-    # Generate synthetic data
+    # Generate synthetic data (kept in memory; no CSV round-trip)
     print("\n📊 Generating synthetic training data...")
-    generate_all_datasets()
+    datasets = generate_all_datasets(save=False)
     
     # Train all models
-    metrics_summary = {}
-    
     try:
-        metrics_summary['uc_1'] = train_uc1()
-        metrics_summary['uc_7'] = train_uc7()
-        metrics_summary['uc_12'] = train_uc12()
-        metrics_summary['uc_13'] = train_uc13()
+        results = Parallel(n_jobs=TRAIN_WORKERS, backend="loky")(
+            delayed(train_uc)(spec, df=datasets[spec["id"]], n_jobs=XGB_THREADS_PER_WORKER)
+            for spec in UC_SPECS
+        )
+        metrics_summary = dict(zip([spec["id"] for spec in UC_SPECS], results))
     except Exception as e:
         print(f"\n❌ Training failed: {e}")
         raise
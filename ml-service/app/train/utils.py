@@ -5,22 +5,24 @@ import joblib
 import json
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.calibration import CalibratedClassifierCV
+from sklearn.isotonic import IsotonicRegression
 from sklearn.metrics import (
     roc_auc_score, average_precision_score, f1_score,
-    confusion_matrix, mean_squared_error, mean_absolute_error
+    confusion_matrix
 )
 import xgboost as xgb
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Union
 from app.config import XGB_PARAMS, MODELS_DIR
+from app.calibration import apply_calibration, fit_platt_calibrator
 
 
-def load_dataset(csv_path: str) -> Tuple[pd.DataFrame, pd.Series]:
-    """Load dataset and split features/labels"""
-    df = pd.read_csv(csv_path)
+def load_dataset(source: Union[str, Path, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.Series]:
+    """Load dataset (CSV path or in-memory DataFrame) and split features/labels"""
+    df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
     
-    # Assume last column is target
-    X = df.iloc[:, :-1]
+    # Assume last column is target; XGBoost works in float32 anyway, so
+    # handing it float32 features skips its internal float64 copy
+    X = df.iloc[:, :-1].astype(np.float32, copy=False)
     y = df.iloc[:, -1]
     
     return X, y
@@ -29,31 +31,43 @@ def load_dataset(csv_path: str) -> Tuple[pd.DataFrame, pd.Series]:
 def time_based_split(X: pd.DataFrame, y: pd.Series, 
                      train_ratio: float = 0.70,
                      val_ratio: float = 0.15) -> Tuple:
-    """Split data chronologically (simulating time-based split)"""
-    n = len(X)
+    """Split data chronologically (simulating time-based split)
+    
+    Converts to ndarrays once and returns positional views, since the splits
+    go straight to XGBoost; the caller keeps X.columns as the feature order.
+    """
+    X_arr = X.to_numpy(dtype=np.float32, copy=False)
+    y_arr = np.asarray(y)
+    
+    n = len(X_arr)
     train_idx = int(n * train_ratio)
     val_idx = int(n * (train_ratio + val_ratio))
     
-    X_train = X.iloc[:train_idx]
-    y_train = y.iloc[:train_idx]
+    X_train = X_arr[:train_idx]
+    y_train = y_arr[:train_idx]
     
-    X_val = X.iloc[train_idx:val_idx]
-    y_val = y.iloc[train_idx:val_idx]
+    X_val = X_arr[train_idx:val_idx]
+    y_val = y_arr[train_idx:val_idx]
     
-    X_test = X.iloc[val_idx:]
-    y_test = y.iloc[val_idx:]
+    X_test = X_arr[val_idx:]
+    y_test = y_arr[val_idx:]
     
     return X_train, X_val, X_test, y_train, y_val, y_test
 
 
-def train_classifier(X_train, y_train, X_val, y_val, scale_pos_weight: float = None):
+def train_classifier(X_train, y_train, X_val, y_val, scale_pos_weight: float = None,
+                     n_jobs: int = None):
     """Train XGBoost classifier with calibration"""
     params = XGB_PARAMS.copy()
+    if n_jobs is not None:
+        params['n_jobs'] = n_jobs
     
     # Handle class imbalance
     if scale_pos_weight is None:
-        neg_count = (y_train == 0).sum()
-        pos_count = (y_train == 1).sum()
+        # Binary 0/1 labels: one counting pass gives both classes
+        y_arr = np.asarray(y_train)
+        pos_count = np.count_nonzero(y_arr)
+        neg_count = y_arr.size - pos_count
         if pos_count > 0:
             scale_pos_weight = neg_count / pos_count
         else:
@@ -65,16 +79,24 @@ def train_classifier(X_train, y_train, X_val, y_val, scale_pos_weight: float = N
     model = xgb.XGBClassifier(**params)
     model.fit(X_train, y_train)
     
-    # Calibrate on validation set
+    # Calibrate the positive-class probability on the validation set with a
+    # 1-D mapping, applied after the model by calibrate_proba()
     n_samples = len(X_val)
-    calibration_method = 'isotonic' if n_samples >= 1000 else 'sigmoid'
+    p_val = model.predict_proba(X_val)[:, 1]
     
-    calibrator = CalibratedClassifierCV(model, method=calibration_method, cv='prefit')
-    calibrator.fit(X_val, y_val)
+    if n_samples >= 1000:
+        calibrator = IsotonicRegression(out_of_bounds='clip').fit(p_val, y_val)
+    else:
+        calibrator = fit_platt_calibrator(p_val, y_val)
     
     return model, calibrator
 
 
+def calibrate_proba(model, calibrator, X) -> np.ndarray:
+    """Get calibrated [negative, positive] class probabilities"""
+    return apply_calibration(calibrator, model.predict_proba(X)[:, 1])
+
+
 def train_regressor(X_train, y_train):
     """Train XGBoost regressor"""
     params = XGB_PARAMS.copy()
@@ -88,22 +110,24 @@ def train_regressor(X_train, y_train):
 
 def compute_classifier_metrics(model, calibrator, X_test, y_test) -> Dict[str, float]:
     """Compute classification metrics"""
-    y_pred_proba = calibrator.predict_proba(X_test)[:, 1]
-    y_pred = (y_pred_proba >= 0.5).astype(int)
+    # Plain ndarrays throughout; no Series alignment or re-conversion per metric
+    y_pred_proba = calibrate_proba(model, calibrator, X_test)[:, 1]
+    y_true = np.asarray(y_test, dtype=np.int8)
+    y_pred = (y_pred_proba >= 0.5).astype(np.int8)
     
     metrics = {
-        'auc': roc_auc_score(y_test, y_pred_proba),
-        'pr_auc': average_precision_score(y_test, y_pred_proba),
-        'f1': f1_score(y_test, y_pred),
-        'accuracy': (y_pred == y_test).mean()
+        'auc': roc_auc_score(y_true, y_pred_proba),
+        'pr_auc': average_precision_score(y_true, y_pred_proba),
+        'f1': f1_score(y_true, y_pred),
+        'accuracy': float(np.mean(y_pred == y_true))
     }
     
     # Compute ECE (Expected Calibration Error)
-    ece = compute_ece(y_test, y_pred_proba)
+    ece = compute_ece(y_true, y_pred_proba)
     metrics['ece'] = ece
     
     # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
+    cm = confusion_matrix(y_true, y_pred)
     metrics['confusion_matrix'] = cm.tolist()
     
     return metrics
@@ -111,16 +135,22 @@ def compute_classifier_metrics(model, calibrator, X_test, y_test) -> Dict[str, f
 
 def compute_regressor_metrics(model, X_test, y_test) -> Dict[str, float]:
     """Compute regression metrics"""
-    y_pred = model.predict(X_test)
+    y_true = np.asarray(y_test, dtype=np.float64)
+    y_pred = np.asarray(model.predict(X_test), dtype=np.float64)
+    
+    # One residual vector feeds every metric below
+    resid = y_true - y_pred
+    ss_res = np.dot(resid, resid)
+    centered = y_true - y_true.mean()
+    residuals = np.abs(resid)
     
     metrics = {
-        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
-        'mae': mean_absolute_error(y_test, y_pred),
-        'r2': 1 - (np.sum((y_test - y_pred) ** 2) / np.sum((y_test - y_test.mean()) ** 2))
+        'rmse': np.sqrt(ss_res / len(y_true)),
+        'mae': residuals.mean(),
+        'r2': 1 - ss_res / np.dot(centered, centered)
     }
     
     # 80% confidence interval coverage
-    residuals = np.abs(y_test - y_pred)
     ci_80 = np.percentile(residuals, 80)
     coverage = (residuals <= ci_80).mean()
     metrics['ci_80_coverage'] = coverage
@@ -130,19 +160,24 @@ def compute_regressor_metrics(model, X_test, y_test) -> Dict[str, float]:
 
 def compute_ece(y_true, y_pred_proba, n_bins: int = 10) -> float:
     """Compute Expected Calibration Error"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred_proba = np.asarray(y_pred_proba, dtype=np.float64)
+    
     bins = np.linspace(0, 1, n_bins + 1)
-    bin_indices = np.digitize(y_pred_proba, bins) - 1
-    
-    ece = 0.0
-    for i in range(n_bins):
-        mask = bin_indices == i
-        if mask.sum() > 0:
-            bin_accuracy = y_true[mask].mean()
-            bin_confidence = y_pred_proba[mask].mean()
-            bin_weight = mask.sum() / len(y_true)
-            ece += bin_weight * np.abs(bin_accuracy - bin_confidence)
-    
-    return ece
+    bin_indices = np.clip(np.digitize(y_pred_proba, bins) - 1, 0, n_bins - 1)
+    
+    # Per-bin counts and sums in one pass each instead of a mask per bin
+    counts = np.bincount(bin_indices, minlength=n_bins)
+    sum_true = np.bincount(bin_indices, weights=y_true, minlength=n_bins)
+    sum_conf = np.bincount(bin_indices, weights=y_pred_proba, minlength=n_bins)
+    
+    nonzero = counts > 0
+    bin_accuracy = np.zeros(n_bins)
+    bin_confidence = np.zeros(n_bins)
+    bin_accuracy[nonzero] = sum_true[nonzero] / counts[nonzero]
+    bin_confidence[nonzero] = sum_conf[nonzero] / counts[nonzero]
+    
+    return float(np.sum(counts / len(y_true) * np.abs(bin_accuracy - bin_confidence)))
 
 
 def save_artifacts(uc_name: str, model, calibrator, explainer, 
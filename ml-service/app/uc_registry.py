@@ -1,90 +1,148 @@
 """Model registry with lazy loading and SHAP explainers"""
+import json
 import joblib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any
 from app.config import MODELS_DIR
 from app.features import feature_extractor
+from app.calibration import apply_calibration
+
+
+def _load_artifact(path: Path) -> Any:
+    """Load a JSON artifact or a joblib pickle fully into memory"""
+    if path.suffix == ".json":
+        with open(path) as f:
+            return json.load(f)
+    # No mmap_mode: retraining rewrites these files in place, which would
+    # change memory-mapped calibrator arrays under a running service
+    return joblib.load(path)
+
+
+@dataclass
+class UCBundle:
+    """Everything loaded for one use case"""
+    model: Any
+    booster: Any
+    calibrator: Any
+    explainer: Any
+    feature_order: List[str]
+    label_array: List[str]
 
 
 class UCRegistry:
     """Lazy-loading registry for trained models"""
     
     def __init__(self):
-        self.models = {}
-        self.calibrators = {}
-        self.explainers = {}
-        self.feature_orders = {}
-        self._loaded_ucs = set()
+        self._ucs: Dict[str, UCBundle] = {}
     
-    def _load_uc(self, uc_id: str):
+    def _ensure_loaded(self, uc_id: str) -> UCBundle:
+        """Get a use case's bundle, loading it on first use"""
+        bundle = self._ucs.get(uc_id)
+        if bundle is None:
+            bundle = self._load_uc(uc_id)
+        return bundle
+    
+    def _load_uc(self, uc_id: str) -> UCBundle:
         """Load model, calibrator, and explainer for a use case"""
-        if uc_id in self._loaded_ucs:
-            return
+        if uc_id in self._ucs:
+            return self._ucs[uc_id]
         
         uc_dir = MODELS_DIR / uc_id
         if not uc_dir.exists():
             raise FileNotFoundError(f"Model directory not found: {uc_dir}")
         
-        # Load model
-        model_path = uc_dir / "model.pkl"
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model not found: {model_path}")
-        self.models[uc_id] = joblib.load(model_path)
-        
-        # Load calibrator
-        calibrator_path = uc_dir / "calibrator.pkl"
-        if not calibrator_path.exists():
-            raise FileNotFoundError(f"Calibrator not found: {calibrator_path}")
-        self.calibrators[uc_id] = joblib.load(calibrator_path)
-        
-        # Load SHAP explainer
-        explainer_path = uc_dir / "explainer.pkl"
-        if not explainer_path.exists():
-            raise FileNotFoundError(f"SHAP explainer not found: {explainer_path}")
-        self.explainers[uc_id] = joblib.load(explainer_path)
-        
-        # Load feature order
-        feature_order_path = uc_dir / "feature_order.pkl"
-        if not feature_order_path.exists():
-            raise FileNotFoundError(f"Feature order not found: {feature_order_path}")
-        self.feature_orders[uc_id] = joblib.load(feature_order_path)
-        
-        self._loaded_ucs.add(uc_id)
+        # The artifact files are independent, so read them concurrently
+        artifact_paths = {
+            "Model": uc_dir / "model.pkl",
+            "Calibrator": uc_dir / "calibrator.pkl",
+            "Feature order": uc_dir / "feature_order.json",
+        }
+        for artifact, path in artifact_paths.items():
+            if not path.exists():
+                raise FileNotFoundError(f"{artifact} not found: {path}")
+        
+        with ThreadPoolExecutor(max_workers=len(artifact_paths)) as executor:
+            model, calibrator, feature_order = executor.map(
+                _load_artifact, artifact_paths.values()
+            )
+        
+        # Build the SHAP explainer from the model (cheaper than unpickling one);
+        # shap is imported here so the app can boot and serve /health without it
+        import shap
+        explainer = shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+        
+        # Display label per feature position, resolved once per UC
+        feature_labels = feature_extractor.get_feature_labels()
+        
+        bundle = UCBundle(
+            model=model,
+            booster=model.get_booster(),
+            calibrator=calibrator,
+            explainer=explainer,
+            feature_order=feature_order,
+            label_array=[feature_labels.get(name, name) for name in feature_order]
+        )
+        
+        self._ucs[uc_id] = bundle
         print(f"✅ Loaded {uc_id}")
+        return bundle
+    
+    def eager_load_all(self):
+        """Load every trained use case under MODELS_DIR up front"""
+        if not MODELS_DIR.exists():
+            return
+        
+        self.eager_preload(sorted(p.name for p in MODELS_DIR.iterdir() if p.is_dir()))
+    
+    def eager_preload(self, uc_ids: List[str]):
+        """Load use cases concurrently and prime their prediction paths"""
+        if not uc_ids:
+            return
+        
+        def preload(uc_id: str):
+            try:
+                bundle = self._ensure_loaded(uc_id)
+                # Throwaway prediction warms XGBoost's and SHAP's first-call paths
+                self.predict_batch(uc_id, np.zeros((1, len(bundle.feature_order)), dtype=np.float32))
+            except Exception as e:
+                # Leave it to lazy loading, which reports the error per request
+                print(f"⚠️ Could not preload {uc_id}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=len(uc_ids)) as executor:
+            list(executor.map(preload, uc_ids))
     
     def get_model(self, uc_id: str):
         """Get model for a use case (lazy load if needed)"""
-        if uc_id not in self._loaded_ucs:
-            self._load_uc(uc_id)
-        return self.models[uc_id]
+        return self._ensure_loaded(uc_id).model
     
     def get_calibrator(self, uc_id: str):
         """Get calibrator for a use case (lazy load if needed)"""
-        if uc_id not in self._loaded_ucs:
-            self._load_uc(uc_id)
-        return self.calibrators[uc_id]
+        return self._ensure_loaded(uc_id).calibrator
     
     def get_explainer(self, uc_id: str):
         """Get SHAP explainer for a use case (lazy load if needed)"""
-        if uc_id not in self._loaded_ucs:
-            self._load_uc(uc_id)
-        return self.explainers[uc_id]
+        return self._ensure_loaded(uc_id).explainer
     
     def get_feature_order(self, uc_id: str):
         """Get feature order for a use case (lazy load if needed)"""
-        if uc_id not in self._loaded_ucs:
-            self._load_uc(uc_id)
-        return self.feature_orders[uc_id]
+        return self._ensure_loaded(uc_id).feature_order
     
     def validate_features(self, uc_id: str, feature_array: np.ndarray) -> bool:
         """Validate feature array matches expected order"""
-        expected_order = self.get_feature_order(uc_id)
+        return self._validate_features(uc_id, self._ensure_loaded(uc_id), feature_array)
+    
+    def _validate_features(self, uc_id: str, bundle: UCBundle, feature_array: np.ndarray) -> bool:
+        """Validate feature array against an already-loaded bundle"""
+        expected_order = bundle.feature_order
+        n_features = feature_array.shape[-1]
         
-        if len(feature_array) != len(expected_order):
+        if n_features != len(expected_order):
             raise ValueError(
                 f"Feature count mismatch for {uc_id}: "
-                f"got {len(feature_array)}, expected {len(expected_order)}"
+                f"got {n_features}, expected {len(expected_order)}"
             )
         
         return True
@@ -95,22 +153,33 @@ class UCRegistry:
         Returns:
             Tuple of (class_probabilities, shap_values)
         """
-        # Validate features
-        self.validate_features(uc_id, features)
-        
-        # Get model and calibrator
-        calibrator = self.get_calibrator(uc_id)
-        explainer = self.get_explainer(uc_id)
-        
         # Reshape if single sample
         if features.ndim == 1:
             features = features.reshape(1, -1)
         
-        # Get calibrated probabilities
-        probs = calibrator.predict_proba(features)
+        return self.predict_batch(uc_id, features)
+    
+    def predict_batch(self, uc_id: str, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Make calibrated predictions for an (N, n_features) batch
+        
+        Returns:
+            Tuple of (class_probabilities [N, 2], shap_values [N, n_features])
+        """
+        # One lookup (and lazy load) for all of the UC's artifacts
+        bundle = self._ensure_loaded(uc_id)
+        
+        # Validate features
+        self._validate_features(uc_id, bundle, features)
         
-        # Get SHAP values
-        shap_values = explainer.shap_values(features)
+        # The models were trained on float32
+        X = np.ascontiguousarray(features, dtype=np.float32)
+        
+        # Get calibrated probabilities: the booster's inplace_predict skips the
+        # sklearn wrapper and DMatrix construction, then a 1-D calibration map
+        probs = apply_calibration(bundle.calibrator, bundle.booster.inplace_predict(X))
+        
+        # Get SHAP values for the whole batch in one call
+        shap_values = bundle.explainer.shap_values(X, check_additivity=False)
         
         return probs, shap_values
     
@@ -126,8 +195,7 @@ class UCRegistry:
         Returns:
             List of dicts with feature name, value, and SHAP contribution
         """
-        feature_order = self.get_feature_order(uc_id)
-        feature_labels = feature_extractor.get_feature_labels()
+        label_array = self._ensure_loaded(uc_id).label_array
         
         # Handle single sample
         if shap_values.ndim == 1:
@@ -143,15 +211,19 @@ class UCRegistry:
         
         # Get absolute SHAP values for ranking
         abs_shap = np.abs(shap_vals)
-        top_indices = np.argsort(abs_shap)[::-1][:top_k]
+        
+        # Partial sort: select the top K in O(n), then order just those K
+        n_top = min(top_k, abs_shap.size)
+        if n_top <= 0:
+            return []
+        split = abs_shap.size - n_top
+        candidates = np.argpartition(abs_shap, split)[split:]
+        top_indices = candidates[np.argsort(abs_shap[candidates])[::-1]]
         
         top_features = []
         for idx in top_indices:
-            feature_name = feature_order[idx]
-            feature_label = feature_labels.get(feature_name, feature_name)
-            
             top_features.append({
-                "feature": feature_label,
+                "feature": label_array[idx],
                 "value": float(feat_vals[idx]),
                 "shap_contribution": float(shap_vals[idx])
             })
@@ -160,11 +232,11 @@ class UCRegistry:
     
     def is_loaded(self, uc_id: str) -> bool:
         """Check if a use case is loaded"""
-        return uc_id in self._loaded_ucs
+        return uc_id in self._ucs
     
     def loaded_models(self) -> list:
         """Get list of loaded model IDs"""
-        return list(self._loaded_ucs)
+        return list(self._ucs)
 
 
 # Global registry instance